@@ -0,0 +1,39 @@
+"""Shared test helpers"""
+
+import asyncio
+
+from two_neurons.executor import TaskExecutor
+from two_neurons.neuron import Neuron, NeuronType
+
+
+class InstantNeuron(Neuron):
+    """Neuron that completes without simulated latency"""
+
+    def __init__(self, name: str, neuron_type: NeuronType, hang: bool = False,
+                 latency: float = 0.0, fail: bool = False):
+        super().__init__(name, neuron_type)
+        self.hang = hang
+        self.latency = latency
+        self.fail = fail
+
+    async def process(self, task: str):
+        if self.hang:
+            await asyncio.Event().wait()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail and task.startswith("boom"):
+            raise RuntimeError(f"cannot process {task}")
+        return {"task": task, "status": "completed", "neuron": self.name}
+
+
+def instant_executor(hang: bool = False, latency: float = 0.0,
+                     fail: bool = False) -> TaskExecutor:
+    """Executor whose primary and secondary neurons respond immediately
+
+    ``latency`` adds a fixed delay, and ``fail`` makes tasks starting with
+    ``boom`` raise.
+    """
+    executor = TaskExecutor()
+    executor.primary = InstantNeuron("Primary", NeuronType.PRIMARY, hang, latency, fail)
+    executor.secondary = InstantNeuron("Secondary", NeuronType.SECONDARY, hang, latency, fail)
+    return executor
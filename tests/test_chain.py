@@ -0,0 +1,81 @@
+"""Test chain compilation and execution plans"""
+
+import asyncio
+import json
+
+import pytest
+
+from two_neurons.chain import ChainValidationError, ExecutionPlan, TaskChain
+
+from .helpers import instant_executor
+
+
+class TestChain:
+    """Test TaskChain compilation"""
+
+    def test_compile_rejects_unknown_neurons(self):
+        """Unknown neurons and empty tasks are reported together"""
+        chain = TaskChain(instant_executor())
+        chain.add_step("primary", "scan")
+        chain.add_step("tertiary", "report")
+        chain.add_step("secondary", "")
+        with pytest.raises(ChainValidationError) as excinfo:
+            chain.compile()
+        assert excinfo.value.problems == [
+            "step 2: neuron 'tertiary' not found",
+            "step 3: task is empty",
+        ]
+
+    def test_compile_is_cached_until_chain_changes(self):
+        """The same plan is reused until any step changes, even in place"""
+        chain = TaskChain(instant_executor())
+        chain.add_step("primary", "scan")
+        plan = chain.compile()
+        assert chain.compile() is plan
+
+        chain.chain_steps[0]["task"] = "rescan"
+        edited = chain.compile()
+        assert edited is not plan
+        assert edited.steps[0].task == "rescan"
+
+        chain.chain_steps.append({"neuron": "secondary", "task": "report"})
+        assert len(chain.compile()) == 2
+
+        chain.chain_steps[0] = {"neuron": "tertiary", "task": "rescan"}
+        with pytest.raises(ChainValidationError):
+            chain.compile()
+
+    def test_plan_reports_unresolved_neurons(self):
+        """Loading a plan on an executor without its neurons fails like compile"""
+        with pytest.raises(ChainValidationError) as excinfo:
+            ExecutionPlan.from_dict(
+                {"version": 1, "steps": [["primary", "scan"], ["tertiary", "report"]],
+                 "custom_neurons": []},
+                instant_executor()
+            )
+        assert excinfo.value.problems == ["step 2: neuron 'tertiary' not found"]
+
+    def test_execute_chain_runs_plan(self):
+        """Executing a chain runs its compiled steps in order"""
+        chain = TaskChain(instant_executor())
+        chain.add_step("primary", "scan")
+        chain.add_step("secondary", "report")
+        results = asyncio.run(chain.execute_chain())
+        assert [(r["neuron"], r["task"]) for r in results] == [
+            ("Primary", "scan"), ("Secondary", "report")
+        ]
+
+    def test_plan_round_trip(self):
+        """A serialized plan runs the same steps on another executor"""
+        executor = instant_executor()
+        executor.add_custom_neuron("auditor")
+        chain = TaskChain(executor)
+        chain.add_step("primary", "scan")
+        chain.add_step("auditor", "review")
+        plan = chain.compile()
+
+        other = instant_executor()
+        loaded = ExecutionPlan.from_dict(json.loads(json.dumps(plan.to_dict())), other)
+        assert loaded.steps == plan.steps
+        assert loaded.plan_id == plan.plan_id
+        assert "auditor" in other.custom_neurons
@@ -1,8 +1,16 @@
 """Test CLI functionality"""
 
+import asyncio
+import io
+import threading
+
 import pytest
 from click.testing import CliRunner
+from rich.console import Console
 from two_neurons.cli import main
+from two_neurons.dashboard import watch
+from two_neurons.distributed import Coordinator, MessageTooLargeError
+from two_neurons.executor import TaskExecutor
 
 
 class TestCLI:
@@ -15,10 +23,36 @@ class TestCLI:
         assert result.exit_code == 0
 
     def test_status_command(self):
-        """Test status command"""
-        runner = CliRunner()
-        result = runner.invoke(main, ["status"])
+        """Test status shows live metrics from a running coordinator"""
+        started = threading.Event()
+        stop = threading.Event()
+        ports = []
+
+        async def serve():
+            async with Coordinator(port=0) as coordinator:
+                ports.append(coordinator.port)
+                started.set()
+                while not stop.is_set():
+                    await asyncio.sleep(0.01)
+
+        thread = threading.Thread(target=asyncio.run, args=(serve(),))
+        thread.start()
+        try:
+            assert started.wait(5)
+            runner = CliRunner()
+            result = runner.invoke(main, ["status", "--port", str(ports[0])])
+        finally:
+            stop.set()
+            thread.join(5)
         assert result.exit_code == 0
+        assert "Neuron Status" in result.output
+
+    def test_status_without_coordinator(self):
+        """Test status fails clearly instead of showing placeholder rows"""
+        runner = CliRunner()
+        result = runner.invoke(main, ["status", "--port", "1"])
+        assert result.exit_code == 1
+        assert "No coordinator at 127.0.0.1:1" in result.output
 
     def test_config_command(self):
         """Test config command"""
@@ -31,3 +65,96 @@ class TestCLI:
         runner = CliRunner()
         result = runner.invoke(main, ["--help"])
         assert result.exit_code == 0
+
+    def test_status_watch_command(self):
+        """Test status --watch stops after --count refreshes"""
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["status", "--watch", "--port", "1", "--count", "2", "--refresh", "50"]
+        )
+        assert result.exit_code == 0
+        assert "Waiting for metrics" in result.output
+
+    def test_run_unknown_neuron(self):
+        """Test run rejects a neuron that does not exist"""
+        runner = CliRunner()
+        result = runner.invoke(main, ["run", "--task", "deploy", "--neuron", "tertiary"])
+        assert result.exit_code == 1
+
+    def test_simulate_command(self):
+        """Test simulate runs a seeded workload"""
+        runner = CliRunner()
+        result = runner.invoke(main, ["simulate", "--tasks", "50", "--seed", "1"])
+        assert result.exit_code == 0
+        assert "Simulation Report" in result.output
+
+    def test_worker_requires_slots(self):
+        """Test worker refuses --concurrency 0"""
+        runner = CliRunner()
+        result = runner.invoke(main, ["worker", "--concurrency", "0"])
+        assert result.exit_code == 2
+
+    def test_status_watch_rejects_zero_refresh(self):
+        """Test status --watch refuses a refresh rate of 0"""
+        runner = CliRunner()
+        result = runner.invoke(main, ["status", "--watch", "--refresh", "0"])
+        assert result.exit_code == 2
+
+    def test_watch_repaints_only_on_change(self):
+        """Test an unchanging snapshot is drawn once however many ticks pass"""
+        snapshot = TaskExecutor().get_snapshot()
+        calls = []
+
+        def draw(count):
+            output = io.StringIO()
+
+            def source():
+                calls.append(count)
+                return snapshot
+
+            console = Console(file=output, width=120, force_terminal=True)
+            asyncio.run(watch(console, source, refresh=1000, count=count))
+            return output.getvalue()
+
+        assert draw(10) == draw(1)
+        assert calls.count(10) == 10
+
+    def test_watch_survives_protocol_errors(self):
+        """Test the dashboard shows a waiting panel for an unreadable snapshot"""
+        output = io.StringIO()
+
+        def source():
+            raise MessageTooLargeError(100000, 65536)
+
+        asyncio.run(watch(Console(file=output, width=120), source, count=1))
+        assert "exceeds the protocol maximum" in output.getvalue()
+
+    def test_chain_rejects_output_for_memory_sink(self, tmp_path):
+        """Test chain refuses --output it would not write to, and --batch-size 0"""
+        output = tmp_path / "out.ndjson"
+        runner = CliRunner()
+        result = runner.invoke(main, ["chain", "--task", "a", "--output", str(output)])
+        assert result.exit_code == 1
+        assert "Results written" not in result.output
+        assert not output.exists()
+        result = runner.invoke(main, ["chain", "--task", "a", "--sink", "ndjson",
+                                      "--output", str(output), "--batch-size", "0"])
+        assert result.exit_code == 2
+
+    def test_simulate_validates_options(self):
+        """Test simulate refuses zero concurrency and out-of-range failure rates"""
+        runner = CliRunner()
+        assert runner.invoke(main, ["simulate", "--concurrency", "0"]).exit_code == 2
+        assert runner.invoke(main, ["simulate", "--failure-rate", "1.5"]).exit_code == 2
+        assert runner.invoke(main, ["simulate", "--latency", "primary=0"]).exit_code == 2
+        assert runner.invoke(main, ["simulate", "--latency", "primary"]).exit_code == 2
+
+    def test_simulate_per_neuron_options(self):
+        """Test simulate accepts per-neuron latencies and failure rates"""
+        runner = CliRunner()
+        result = runner.invoke(main, [
+            "simulate", "--tasks", "20", "--latency", "primary=0.2",
+            "--neuron-failure-rate", "secondary=1"
+        ])
+        assert result.exit_code == 0
+        assert "failed" in result.output
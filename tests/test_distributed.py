@@ -0,0 +1,349 @@
+"""Test distributed coordinator/worker execution"""
+
+import asyncio
+import gc
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+
+from two_neurons.chain import TaskChain
+from two_neurons.distributed import (
+    Coordinator, MessageTooLargeError, ProtocolError, Worker, fetch_status
+)
+from two_neurons.sinks import MemorySink
+
+from .helpers import instant_executor
+
+
+class TestDistributed:
+    """Test coordinator and workers over localhost TCP"""
+
+    def test_chain_tasks_sharded_across_workers(self):
+        """Results come back in order and every worker takes a share"""
+        async def scenario():
+            async with Coordinator(port=0) as coordinator:
+                workers = [
+                    Worker(port=coordinator.port, concurrency=2, executor=instant_executor())
+                    for _ in range(3)
+                ]
+                runs = [asyncio.ensure_future(w.run()) for w in workers]
+                await coordinator.wait_for_workers(3, timeout=5)
+                tasks = [f"task_{i}" for i in range(30)]
+                results = await coordinator.chain_tasks(tasks, "primary_to_secondary")
+            await asyncio.wait_for(asyncio.gather(*runs), timeout=5)
+            return tasks, results, workers
+
+        tasks, results, workers = asyncio.run(scenario())
+        assert [r["task"] for r in results[::2]] == tasks
+        assert [r["task"] for r in results[1::2]] == [f"validate_{t}" for t in tasks]
+        assert sum(w.completed for w in workers) == 30
+        assert all(w.completed > 0 for w in workers)
+
+    def test_stream_chain_tasks_bounds_outstanding_jobs(self):
+        """Streaming never has more than ``window`` jobs running at once"""
+        async def scenario():
+            sink = MemorySink()
+            executor = instant_executor(latency=0.005)
+            process = executor.process
+            in_flight = {"now": 0, "peak": 0}
+
+            # Steps of a job run one after another, so concurrent steps are
+            # concurrent jobs
+            async def tracking_process(neuron, task):
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+                try:
+                    return await process(neuron, task)
+                finally:
+                    in_flight["now"] -= 1
+
+            executor.process = tracking_process
+            async with Coordinator(port=0) as coordinator:
+                worker = Worker(port=coordinator.port, concurrency=16, prefetch=0,
+                                executor=executor)
+                run = asyncio.ensure_future(worker.run())
+                await coordinator.wait_for_workers(1, timeout=5)
+                summary = await coordinator.stream_chain_tasks(
+                    (f"t{i}" for i in range(50)), "primary_to_secondary", sink, window=4
+                )
+            await asyncio.wait_for(run, timeout=5)
+            return summary, sink, in_flight["peak"]
+
+        summary, sink, peak = asyncio.run(scenario())
+        assert summary.total == 100
+        assert sorted(r["task"] for r in sink.results[::2]) == sorted(f"t{i}" for i in range(50))
+        assert 1 < peak <= 4
+
+    def test_execute_chains_ships_compiled_plans(self):
+        """Each workflow runs as a compiled plan, custom neurons included"""
+        async def scenario():
+            local = instant_executor()
+            local.add_custom_neuron("auditor")
+            chains = []
+            for name in ("scan", "patch"):
+                chain = TaskChain(local)
+                chain.add_step("primary", name)
+                chain.add_step("auditor", f"review_{name}")
+                chains.append(chain)
+            async with Coordinator(port=0) as coordinator:
+                worker = Worker(port=coordinator.port, executor=instant_executor())
+                run = asyncio.ensure_future(worker.run())
+                await coordinator.wait_for_workers(1, timeout=5)
+                results = await coordinator.execute_chains(chains)
+            await asyncio.wait_for(run, timeout=5)
+            return results, worker
+
+        results, worker = asyncio.run(scenario())
+        assert [[r["task"] for r in chain] for chain in results] == [
+            ["scan", "review_scan"], ["patch", "review_patch"]
+        ]
+        assert "auditor" in worker.executor.custom_neurons
+
+    def test_silent_worker_jobs_are_reassigned(self):
+        """Jobs held by a worker that stops heartbeating go to another worker"""
+        async def scenario():
+            async with Coordinator(port=0, heartbeat_timeout=0.3) as coordinator:
+                stuck = Worker(port=coordinator.port, heartbeat_interval=60,
+                               executor=instant_executor(hang=True))
+                stuck_run = asyncio.ensure_future(stuck.run())
+                await coordinator.wait_for_workers(1, timeout=5)
+                pending = asyncio.ensure_future(
+                    coordinator.chain_tasks(["a", "b"], "secondary_to_primary")
+                )
+                await asyncio.sleep(0.1)
+                healthy = Worker(port=coordinator.port, executor=instant_executor())
+                healthy_run = asyncio.ensure_future(healthy.run())
+                results = await asyncio.wait_for(pending, timeout=5)
+            stuck_run.cancel()
+            await asyncio.wait_for(healthy_run, timeout=5)
+            return results, healthy
+
+        results, healthy = asyncio.run(scenario())
+        assert [r["task"] for r in results] == ["a", "execute_a", "b", "execute_b"]
+        assert healthy.completed == 2
+
+    def test_stop_cancels_unfinished_jobs(self):
+        """Stopping the coordinator resolves every job, assigned or not"""
+        async def scenario():
+            coordinator = Coordinator(port=0)
+            await coordinator.start()
+            worker = Worker(port=coordinator.port, concurrency=1, prefetch=1,
+                            executor=instant_executor(hang=True))
+            run = asyncio.ensure_future(worker.run())
+            await coordinator.wait_for_workers(1, timeout=5)
+            jobs = [coordinator.submit([("primary", f"t{i}")]) for i in range(3)]
+            chained = asyncio.ensure_future(coordinator.chain_tasks(["c"], "primary_to_secondary"))
+            await asyncio.sleep(0.1)
+            await coordinator.stop()
+            await asyncio.sleep(0.1)
+            outcome = await asyncio.wait_for(
+                asyncio.gather(chained, return_exceptions=True), timeout=5
+            )
+            late = coordinator.submit([("primary", "late")])
+            await asyncio.wait_for(run, timeout=5)
+            return jobs, outcome, late, coordinator.get_snapshot()["queue_depth"]
+
+        jobs, outcome, late, queue_depth = asyncio.run(scenario())
+        assert all(job.cancelled() for job in jobs)
+        assert isinstance(outcome[0], asyncio.CancelledError)
+        assert late.cancelled()
+        assert queue_depth == 0
+
+    def test_status_merges_worker_metrics(self):
+        """Heartbeat metrics from every worker reach ``fetch_status``"""
+        async def scenario():
+            async with Coordinator(port=0) as coordinator:
+                workers = [
+                    Worker(port=coordinator.port, heartbeat_interval=0.05,
+                           executor=instant_executor())
+                    for _ in range(2)
+                ]
+                runs = [asyncio.ensure_future(w.run()) for w in workers]
+                await coordinator.wait_for_workers(2, timeout=5)
+                await coordinator.chain_tasks([f"t{i}" for i in range(10)],
+                                              "primary_to_secondary")
+                await asyncio.sleep(0.2)
+                snapshot = await fetch_status(port=coordinator.port)
+            await asyncio.wait_for(asyncio.gather(*runs), timeout=5)
+            return snapshot
+
+        snapshot = asyncio.run(scenario())
+        assert snapshot["workers"] == 2
+        assert snapshot["queue_depth"] == 0
+        assert snapshot["neurons"]["Primary"]["completed"] == 10
+        assert sum(snapshot["neurons"]["Secondary"]["latency_histogram"]) == 10
+        # Fixed-size histograms keep the snapshot small however many tasks ran
+        assert len(json.dumps(snapshot)) < 4096
+
+    def test_large_job_round_trips(self):
+        """Messages well past asyncio's default 64 KiB line limit get through"""
+        async def scenario():
+            chain = TaskChain(instant_executor())
+            for i in range(1500):
+                chain.add_step("primary", f"step_{i:04d}_" + "x" * 40)
+            async with Coordinator(port=0) as coordinator:
+                workers = [Worker(port=coordinator.port, executor=instant_executor())
+                           for _ in range(2)]
+                runs = [asyncio.ensure_future(w.run()) for w in workers]
+                await coordinator.wait_for_workers(2, timeout=5)
+                results = await asyncio.wait_for(coordinator.execute_chains([chain]), 10)
+                connected = len(coordinator.workers)
+            await asyncio.wait_for(asyncio.gather(*runs), timeout=5)
+            return results, connected
+
+        results, connected = asyncio.run(scenario())
+        assert len(results[0]) == 1500
+        assert connected == 2
+
+    def test_oversized_messages_fail_their_job(self):
+        """Overlong jobs and results fail the job and keep the worker connected"""
+        async def scenario():
+            big_result = [("primary", "t")] * 300
+            async with Coordinator(port=0, max_message_size=8192) as coordinator:
+                worker = Worker(port=coordinator.port, executor=instant_executor())
+                run = asyncio.ensure_future(worker.run())
+                await coordinator.wait_for_workers(1, timeout=5)
+                too_big_job = coordinator.submit([("primary", "x" * 10000)])
+                overrun = coordinator.submit(big_result)
+                errors = await asyncio.gather(too_big_job, overrun, return_exceptions=True)
+                after = await asyncio.wait_for(coordinator.submit([("primary", "ok")]), 5)
+                connected = len(coordinator.workers)
+            await asyncio.wait_for(run, timeout=5)
+
+            async with Coordinator(port=0) as coordinator:
+                small = Worker(port=coordinator.port, executor=instant_executor(),
+                               max_message_size=8192)
+                run = asyncio.ensure_future(small.run())
+                await coordinator.wait_for_workers(1, timeout=5)
+                try:
+                    await asyncio.wait_for(coordinator.submit(big_result), 5)
+                except ProtocolError as exc:
+                    errors.append(exc)
+            await asyncio.wait_for(run, timeout=5)
+            return errors, after, connected
+
+        errors, after, connected = asyncio.run(scenario())
+        assert all(isinstance(e, ProtocolError) for e in errors)
+        assert isinstance(errors[1], MessageTooLargeError)
+        assert "exceeds the protocol maximum" in str(errors[2])
+        assert after[0]["task"] == "ok"
+        assert connected == 1
+
+    def test_failing_step_reports_error(self):
+        """A neuron that raises yields an error result and the slot keeps running"""
+        async def scenario():
+            async with Coordinator(port=0) as coordinator:
+                worker = Worker(port=coordinator.port, concurrency=1,
+                                executor=instant_executor(fail=True))
+                run = asyncio.ensure_future(worker.run())
+                await coordinator.wait_for_workers(1, timeout=5)
+                failed = await asyncio.wait_for(coordinator.submit([("primary", "boom")]), 5)
+                after = await asyncio.wait_for(coordinator.submit([("primary", "fine")]), 5)
+            await asyncio.wait_for(run, timeout=5)
+            return failed, after
+
+        failed, after = asyncio.run(scenario())
+        assert failed == [{"error": "RuntimeError: cannot process boom"}]
+        assert after[0]["task"] == "fine"
+
+    def test_rejects_workers_without_slots(self):
+        """A hello advertising no execution slots is turned away"""
+        async def scenario():
+            async with Coordinator(port=0) as coordinator:
+                reader, writer = await asyncio.open_connection("127.0.0.1", coordinator.port)
+                writer.write(json.dumps(
+                    {"type": "hello", "concurrency": 0, "prefetch": 0}
+                ).encode() + b"\n")
+                reply = json.loads(await reader.readline())
+                writer.close()
+                return reply, len(coordinator.workers)
+
+        reply, connected = asyncio.run(scenario())
+        assert reply["type"] == "rejected"
+        assert connected == 0
+        with pytest.raises(ValueError):
+            Worker(concurrency=0)
+
+    def test_non_object_messages_are_protocol_errors(self):
+        """JSON that is not an object drops the peer instead of crashing its handler"""
+        async def scenario():
+            errors = []
+            asyncio.get_running_loop().set_exception_handler(
+                lambda loop, context: errors.append(context)
+            )
+            async with Coordinator(port=0) as coordinator:
+                for lines in ([b"[1, 2]"], [b'{"type": "hello", "concurrency": 1}', b'"oops"']):
+                    reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                                   coordinator.port)
+                    writer.write(b"\n".join(lines) + b"\n")
+                    assert await asyncio.wait_for(reader.read(), timeout=5) == b""
+                    writer.close()
+                connected = len(coordinator.workers)
+
+            async def fake_coordinator(reader, writer):
+                await reader.readline()
+                writer.write(b'"oops"\n')
+
+            server = await asyncio.start_server(fake_coordinator, "127.0.0.1", 0)
+            worker = Worker(port=server.sockets[0].getsockname()[1])
+            try:
+                await asyncio.wait_for(worker.run(), timeout=5)
+            except ProtocolError as exc:
+                worker_error = exc
+            server.close()
+            gc.collect()
+            return errors, connected, worker_error
+
+        errors, connected, worker_error = asyncio.run(scenario())
+        assert errors == []
+        assert connected == 0
+        assert "expected a JSON object" in str(worker_error)
+
+    def test_throughput_scales_with_workers(self):
+        """Four workers finish a fixed workload at least 2.5x faster than one"""
+        async def elapsed(count):
+            async with Coordinator(port=0) as coordinator:
+                workers = [Worker(port=coordinator.port, concurrency=1, prefetch=1,
+                                  executor=instant_executor(latency=0.01))
+                           for _ in range(count)]
+                runs = [asyncio.ensure_future(w.run()) for w in workers]
+                await coordinator.wait_for_workers(count, timeout=5)
+                started = time.perf_counter()
+                await coordinator.chain_tasks([f"t{i}" for i in range(40)],
+                                              "primary_to_secondary")
+                taken = time.perf_counter() - started
+            await asyncio.wait_for(asyncio.gather(*runs), timeout=5)
+            return taken
+
+        single = asyncio.run(elapsed(1))
+        quad = asyncio.run(elapsed(4))
+        assert single / quad > 2.5
+
+    def test_worker_processes(self):
+        """Separate ``two-neurons worker`` processes serve a coordinator"""
+        async def scenario():
+            coordinator = Coordinator(port=0)
+            await coordinator.start()
+            procs = [
+                subprocess.Popen([
+                    sys.executable, "-m", "two_neurons", "worker",
+                    "--port", str(coordinator.port), "--concurrency", "2"
+                ])
+                for _ in range(2)
+            ]
+            try:
+                await coordinator.wait_for_workers(2, timeout=15)
+                return await coordinator.chain_tasks(
+                    ["w1", "w2", "w3", "w4"], "primary_to_secondary"
+                )
+            finally:
+                await coordinator.stop()
+                for proc in procs:
+                    proc.wait(timeout=10)
+
+        results = asyncio.run(scenario())
+        assert len(results) == 8
+        assert all(r["status"] == "completed" for r in results)
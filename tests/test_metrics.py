@@ -0,0 +1,59 @@
+"""Test latency histograms and percentiles"""
+
+import math
+import time
+
+from two_neurons.metrics import LATENCY_BUCKETS, NeuronStats, merge_snapshots, percentile
+
+
+class TestMetrics:
+    """Test metric collection and summarising"""
+
+    def test_finish_buckets_latency(self):
+        """A finished task lands in the bucket whose bound covers its latency"""
+        stats = NeuronStats()
+        stats.start()
+        # 3.5ms sits between the 2**1.75ms (~3.36ms) and 4ms bounds
+        stats.finish(time.monotonic() - 0.0035)
+        assert LATENCY_BUCKETS[7] < 0.0035 <= LATENCY_BUCKETS[8]
+        assert stats.latency_histogram[8] == 1
+        assert sum(stats.latency_histogram) == 1
+        assert stats.in_flight == 0
+        assert stats.completed == 1
+
+    def test_percentile_of_known_histogram(self):
+        """Percentiles come from the bucket holding the requested rank"""
+        histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        histogram[0] = 10
+        histogram[8] = 80
+        histogram[16] = 10
+
+        assert percentile(histogram, 0.05) == LATENCY_BUCKETS[0]
+        assert percentile(histogram, 0.50) == math.sqrt(LATENCY_BUCKETS[7] * LATENCY_BUCKETS[8])
+        assert percentile(histogram, 0.90) == math.sqrt(LATENCY_BUCKETS[7] * LATENCY_BUCKETS[8])
+        assert percentile(histogram, 0.95) == math.sqrt(
+            LATENCY_BUCKETS[15] * LATENCY_BUCKETS[16]
+        )
+        assert 0.010 < percentile(histogram, 0.99) < 0.016
+
+    def test_percentile_edges(self):
+        """Empty histograms give 0 and the overflow bucket is capped"""
+        histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        assert percentile(histogram, 0.5) == 0.0
+        histogram[-1] = 1
+        assert percentile(histogram, 0.5) == LATENCY_BUCKETS[-1]
+
+    def test_merge_snapshots_sums_histograms(self):
+        """Merging adds counts bucket by bucket"""
+        first, second = NeuronStats(), NeuronStats()
+        first.latency_histogram[3] = 2
+        second.latency_histogram[3] = 1
+        second.latency_histogram[5] = 4
+        merged = merge_snapshots([
+            {"neurons": {"Primary": first.snapshot()}},
+            {"neurons": {"Primary": second.snapshot()}}
+        ])
+        histogram = merged["Primary"]["latency_histogram"]
+        assert histogram[3] == 3
+        assert histogram[5] == 4
+        assert sum(histogram) == 7
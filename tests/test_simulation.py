@@ -0,0 +1,113 @@
+"""Test virtual-time simulation"""
+
+import asyncio
+
+import pytest
+
+from two_neurons.executor import TaskExecutor
+from two_neurons.neuron import NeuronType
+from two_neurons.simulation import SimulatedNeuron, run_virtual, simulate
+from two_neurons.sinks import MemorySink
+
+
+class TestSimulation:
+    """Test the virtual-time loop and simulated workloads"""
+
+    def test_virtual_loop_skips_real_sleeps(self):
+        """Real neurons run on virtual time without waiting"""
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            results = await TaskExecutor().chain_tasks(["a", "b"], "primary_to_secondary")
+            return results, loop.time()
+
+        results, elapsed = run_virtual(scenario())
+        assert len(results) == 4
+        assert elapsed == pytest.approx(5.0)
+
+    def test_executor_streams_with_concurrency(self):
+        """The executor's own scheduler runs tasks side by side"""
+        async def scenario(concurrency):
+            loop = asyncio.get_running_loop()
+            sink = MemorySink()
+            await TaskExecutor().stream_chain_tasks(
+                [f"t{i}" for i in range(4)], "primary_to_secondary", sink, concurrency
+            )
+            return sink.summary.total, loop.time()
+
+        assert run_virtual(scenario(1)) == (8, pytest.approx(10.0))
+        assert run_virtual(scenario(4)) == (8, pytest.approx(2.5))
+        with pytest.raises(ValueError):
+            run_virtual(scenario(0))
+
+    def test_constant_latency_and_concurrency(self):
+        """Virtual duration follows the latency model and concurrency limit"""
+        serial = simulate([f"t{i}" for i in range(100)], concurrency=1)
+        parallel = simulate([f"t{i}" for i in range(100)], concurrency=10)
+        assert serial.virtual_seconds == pytest.approx(250.0)
+        assert parallel.virtual_seconds == pytest.approx(25.0)
+        assert parallel.summary.by_status == {"completed": 200}
+
+    def test_seed_makes_runs_reproducible(self):
+        """Same seed, same outcome; different seed, different outcome"""
+        def run(seed):
+            return simulate(
+                (f"t{i}" for i in range(2000)), concurrency=50, retries=2,
+                distribution="lognormal", failure_rate=0.1, seed=seed
+            )
+
+        first, second, other = run(1), run(1), run(2)
+        assert first.to_dict()["summary"] == second.to_dict()["summary"]
+        assert first.retries == second.retries
+        assert first.virtual_seconds == second.virtual_seconds
+        assert first.virtual_seconds != other.virtual_seconds
+
+    def test_retries_recover_failures(self):
+        """Retried steps mostly succeed and every retry is counted"""
+        report = simulate(
+            (f"t{i}" for i in range(1000)), concurrency=20, retries=3,
+            failure_rate=0.2, seed=5
+        )
+        assert report.retries > 0
+        assert report.summary.by_status.get("failed", 0) < 10
+        assert report.summary.total == 2000
+
+    def test_per_neuron_latency_and_failures(self):
+        """Latencies and failure rates can be set for individual neurons"""
+        report = simulate(
+            [f"t{i}" for i in range(10)], latencies={"primary": 0.5},
+            failure_rates={"secondary": 1.0}
+        )
+        assert report.virtual_seconds == pytest.approx(15.0)
+        assert report.summary.by_neuron == {"Primary": 10, "Secondary": 10}
+        assert report.summary.by_status == {"completed": 10, "failed": 10}
+
+    def test_rejects_invalid_workloads(self):
+        """Workloads need at least one slot and a failure rate in [0, 1]"""
+        with pytest.raises(ValueError):
+            simulate(["t"], concurrency=0)
+        with pytest.raises(ValueError):
+            simulate(["t"], failure_rate=1.5)
+        with pytest.raises(ValueError):
+            simulate(["t"], retries=-1)
+        with pytest.raises(ValueError):
+            simulate(["t"], chain_type="primary_to_tertiary")
+        with pytest.raises(ValueError):
+            simulate(["t"], distribution="exponential", latencies={"primary": 0})
+        with pytest.raises(ValueError):
+            simulate(["t"], failure_rates={"secondary": -0.1})
+
+    def test_run_virtual_keeps_callers_loop(self):
+        """Running a simulation leaves the caller's event loop installed"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            run_virtual(asyncio.sleep(10))
+            assert asyncio.get_event_loop_policy().get_event_loop() is loop
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    def test_unknown_distribution(self):
+        """Simulated neurons reject unknown distributions"""
+        with pytest.raises(ValueError):
+            SimulatedNeuron("Primary", NeuronType.PRIMARY, 1.0, distribution="pareto")
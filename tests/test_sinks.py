@@ -0,0 +1,103 @@
+"""Test result sinks"""
+
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from two_neurons.chain import TaskChain
+from two_neurons.sinks import (
+    ColumnarSink, NDJSONSink, ResultSink, create_sink, read_columnar
+)
+
+from .helpers import instant_executor
+
+RESULTS = [
+    {"task": "scan", "status": "completed", "neuron": "Primary", "strategy": "primary"},
+    {"task": "validate_scan", "status": "completed", "neuron": "Secondary"},
+    {"error": "Neuron 'tertiary' not found"},
+    {"task": "report", "status": "completed", "neuron": "Secondary", "strategy": None},
+]
+
+
+class TestSinks:
+    """Test sink output and streaming summaries"""
+
+    def test_ndjson_sink_writes_in_batches(self, tmp_path):
+        """Results reach the file once a batch fills, and all of them on close"""
+        path = tmp_path / "results.ndjson"
+        with NDJSONSink(str(path), batch_size=2) as sink:
+            for result in RESULTS:
+                sink.add(result)
+            assert len(path.read_text().splitlines()) == 4
+            sink.add(RESULTS[0])
+            assert len(path.read_text().splitlines()) == 4
+        assert [json.loads(line) for line in path.read_text().splitlines()] == RESULTS + RESULTS[:1]
+        assert sink.summary.to_dict() == {
+            "total": 5,
+            "by_status": {"completed": 4, "error": 1},
+            "by_neuron": {"Primary": 2, "Secondary": 2, "unknown": 1},
+        }
+
+    def test_sqlite_sink(self, tmp_path):
+        """Each result becomes one row"""
+        path = str(tmp_path / "results.db")
+        with create_sink("sqlite", path, batch_size=2) as sink:
+            for result in RESULTS:
+                sink.add(result)
+        rows = sqlite3.connect(path).execute(
+            "SELECT task, neuron, status, result FROM results ORDER BY id"
+        ).fetchall()
+        assert [json.loads(row[3]) for row in rows] == RESULTS
+        assert rows[0][:3] == ("scan", "Primary", "completed")
+
+    def test_columnar_round_trip(self, tmp_path):
+        """Columnar batches read back as the original rows"""
+        path = str(tmp_path / "results.columnar")
+        with ColumnarSink(path, batch_size=2) as sink:
+            for result in RESULTS:
+                sink.add(result)
+        assert list(read_columnar(path)) == RESULTS
+
+    def test_sinks_must_write_batches(self):
+        """A sink without _write_batch cannot be created"""
+        class Incomplete(ResultSink):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_create_sink_needs_path(self):
+        """File-backed sinks refuse to start without a path"""
+        with pytest.raises(ValueError):
+            create_sink("ndjson")
+
+    def test_create_sink_rejects_unused_path(self):
+        """The memory sink refuses a path it would silently ignore"""
+        with pytest.raises(ValueError):
+            create_sink("memory", "results.ndjson")
+        with pytest.raises(ValueError):
+            create_sink("ndjson", "results.ndjson", batch_size=0)
+
+    def test_stream_chain_tasks(self, tmp_path):
+        """Chained results stream from a generator into the sink"""
+        path = tmp_path / "results.ndjson"
+        executor = instant_executor()
+        with NDJSONSink(str(path), batch_size=3) as sink:
+            summary = asyncio.run(executor.stream_chain_tasks(
+                (f"task_{i}" for i in range(5)), "secondary_to_primary", sink
+            ))
+        assert summary.total == 10
+        assert summary.by_neuron == {"Primary": 5, "Secondary": 5}
+        assert len(path.read_text().splitlines()) == 10
+
+    def test_stream_chain(self, tmp_path):
+        """A workflow run can stream into a sink too"""
+        chain = TaskChain(instant_executor())
+        chain.add_step("primary", "scan")
+        chain.add_step("secondary", "report")
+        with create_sink("memory") as sink:
+            summary = asyncio.run(chain.stream_chain(sink))
+        assert summary.total == 2
+        assert [r["task"] for r in sink.results] == ["scan", "report"]
@@ -0,0 +1,5 @@
+"""Allow running Two Neurons with ``python -m two_neurons``"""
+
+from .cli import main
+
+main()
@@ -1,8 +1,124 @@
 """Chain operations between neurons"""
 
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import json
+from typing import List, Dict, Any, NamedTuple, Optional, Sequence, Tuple
 from .neuron import Neuron
 from .executor import TaskExecutor
+from .sinks import ResultSink, ResultSummary
+
+PLAN_FORMAT_VERSION = 1
+
+
+class ChainValidationError(ValueError):
+    """Raised when a chain cannot be compiled into an execution plan"""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+class PlanStep(NamedTuple):
+    """One step of an execution plan"""
+    neuron: str
+    task: str
+
+
+def _resolve_neuron(executor: TaskExecutor, index: int, name: str,
+                    problems: List[str]) -> Optional[Neuron]:
+    """Look up a step's neuron, recording a problem if it does not exist"""
+    neuron = executor.get_neuron(name)
+    if neuron is None:
+        problems.append(f"step {index + 1}: neuron '{name}' not found")
+    return neuron
+
+
+class ExecutionPlan:
+    """Validated, immutable chain steps with their neurons resolved
+
+    Plans are produced by ``TaskChain.compile`` and can be run any number of
+    times. ``to_dict``/``from_dict`` round-trip a plan so workers can load it
+    against their own executor; loading resolves every step's neuron again
+    and raises ``ChainValidationError`` for any the executor lacks.
+    """
+
+    __slots__ = ("_steps", "_custom_neurons", "_plan_id", "_executor", "_bound")
+
+    def __init__(self, steps: Sequence[PlanStep], custom_neurons: Sequence[str],
+                 executor: TaskExecutor, plan_id: Optional[str] = None,
+                 neurons: Optional[Sequence[Neuron]] = None):
+        self._steps: Tuple[PlanStep, ...] = tuple(steps)
+        self._custom_neurons: Tuple[str, ...] = tuple(custom_neurons)
+        self._plan_id = plan_id or self._digest()
+        self._executor = executor
+        if neurons is None:
+            problems: List[str] = []
+            neurons = [
+                _resolve_neuron(executor, i, step.neuron, problems)
+                for i, step in enumerate(self._steps)
+            ]
+            if problems:
+                raise ChainValidationError(problems)
+        self._bound: Tuple[Tuple[Neuron, str], ...] = tuple(
+            (neuron, step.task) for neuron, step in zip(neurons, self._steps)
+        )
+
+    @property
+    def steps(self) -> Tuple[PlanStep, ...]:
+        return self._steps
+
+    @property
+    def custom_neurons(self) -> Tuple[str, ...]:
+        return self._custom_neurons
+
+    @property
+    def plan_id(self) -> str:
+        """Content hash identifying this plan"""
+        return self._plan_id
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    async def run(self) -> List[Dict[str, Any]]:
+        """Execute every step in order"""
+        process = self._executor.process
+        return [await process(neuron, task) for neuron, task in self._bound]
+
+    async def run_into(self, sink: ResultSink) -> ResultSummary:
+        """Execute every step in order, writing each result to ``sink``"""
+        process = self._executor.process
+        for neuron, task in self._bound:
+            sink.add(await process(neuron, task))
+        sink.flush()
+        return sink.summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the plan to plain data"""
+        return {
+            "version": PLAN_FORMAT_VERSION,
+            "plan_id": self._plan_id,
+            "steps": [list(step) for step in self._steps],
+            "custom_neurons": list(self._custom_neurons)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], executor: TaskExecutor) -> "ExecutionPlan":
+        """Load a serialized plan, registering its custom neurons on ``executor``"""
+        if data.get("version") != PLAN_FORMAT_VERSION:
+            raise ChainValidationError([f"unsupported plan version {data.get('version')!r}"])
+        for name in data["custom_neurons"]:
+            executor.add_custom_neuron(name)
+        return cls(
+            [PlanStep(*step) for step in data["steps"]],
+            data["custom_neurons"],
+            executor,
+            plan_id=data.get("plan_id")
+        )
+
+    def _digest(self) -> str:
+        content = json.dumps([self._steps, self._custom_neurons]).encode()
+        return hashlib.sha1(content).hexdigest()
 
 
 class TaskChain:
@@ -11,6 +127,7 @@ class TaskChain:
     def __init__(self, executor: TaskExecutor):
         self.executor = executor
         self.chain_steps: List[Dict[str, Any]] = []
+        self._plan: Optional[ExecutionPlan] = None
 
     def add_step(self, neuron_name: str, task: str) -> None:
         """Add a step to the chain"""
@@ -18,16 +135,36 @@ class TaskChain:
             "neuron": neuron_name,
             "task": task
         })
+        self._plan = None
+
+    def compile(self) -> ExecutionPlan:
+        """Validate the chain once and return its cached execution plan"""
+        # chain_steps is public and may be edited in place, so the cache is
+        # keyed on its full contents rather than invalidated by add_step alone
+        steps = tuple(PlanStep(step["neuron"], step["task"]) for step in self.chain_steps)
+        if self._plan is not None and self._plan.steps == steps:
+            return self._plan
+
+        problems: List[str] = []
+        neurons = []
+        for i, step in enumerate(steps):
+            neurons.append(_resolve_neuron(self.executor, i, step.neuron, problems))
+            if not step.task:
+                problems.append(f"step {i + 1}: task is empty")
+        if problems:
+            raise ChainValidationError(problems)
+
+        custom = sorted({step.neuron for step in steps} & set(self.executor.custom_neurons))
+        self._plan = ExecutionPlan(steps, custom, self.executor, neurons=neurons)
+        return self._plan
 
     async def execute_chain(self) -> List[Dict[str, Any]]:
         """Execute the entire chain"""
-        results = []
-        for step in self.chain_steps:
-            neuron = self.executor.get_neuron(step["neuron"])
-            if neuron:
-                result = await neuron.process(step["task"])
-                results.append(result)
-        return results
+        return await self.compile().run()
+
+    async def stream_chain(self, sink: ResultSink) -> ResultSummary:
+        """Execute the entire chain, writing each result to ``sink``"""
+        return await self.compile().run_into(sink)
 
     def get_chain_info(self) -> List[Dict[str, str]]:
         """Get information about the chain"""
@@ -1,15 +1,36 @@
 """Command Line Interface for Two Neurons"""
 
+import asyncio
+
 import click
 from rich.console import Console
-from rich.table import Table
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn
-from typing import Optional
+from rich.table import Table
+from typing import Dict, Iterator, Optional, Tuple
+
+from .dashboard import render_status, status_rows, watch
+from .distributed import DEFAULT_HOST, DEFAULT_PORT, ProtocolError, Worker, fetch_status
+from .executor import CHAIN_TYPES, TaskExecutor
+from .simulation import DISTRIBUTIONS, simulate as run_simulation
+from .sinks import SINKS, create_sink
 
 console = Console()
 
 
+def _per_neuron(ctx, param, values: Tuple[str, ...]) -> Dict[str, float]:
+    """Parse repeated NAME=NUMBER options into a mapping"""
+    parsed = {}
+    for value in values:
+        name, _, number = value.partition("=")
+        try:
+            parsed[name] = float(number)
+        except ValueError:
+            raise click.BadParameter(f"expected NAME=NUMBER, got '{value}'")
+        if not name:
+            raise click.BadParameter(f"expected NAME=NUMBER, got '{value}'")
+    return parsed
+
+
 @click.group()
 @click.version_option(version="1.0.0")
 def main():
@@ -29,39 +50,165 @@ def init():
 @main.command()
 @click.option('--task', required=True, help='Task to execute')
 @click.option('--neuron', default='primary', help='Neuron to use (primary, secondary, both)')
-def run(task: str, neuron: str):
+@click.option('--refresh', default=4.0, type=click.FloatRange(min=0, min_open=True),
+              help='Dashboard refreshes per second')
+def run(task: str, neuron: str, refresh: float):
     """Run a task on neurons"""
-    with Progress(
-        SpinnerColumn(),
-        "[progress.description]{task.description}",
-    ) as progress:
-        task1 = progress.add_task("Processing on neurons...", total=None)
-        progress.update(task1, description=f"Running task: {task}")
-        progress.stop_task(task1)
-
+    executor = TaskExecutor()
+    names = ["primary", "secondary"] if neuron == "both" else [neuron]
+    if not all(executor.get_neuron(name) for name in names):
+        console.print(f"[bold red]Neuron '{neuron}' not found[/bold red]")
+        raise SystemExit(1)
+
+    async def _run():
+        pending = asyncio.ensure_future(
+            asyncio.gather(*(executor.execute_task(task, name) for name in names))
+        )
+        await watch(console, executor.get_snapshot, refresh, until=pending.done)
+        return await pending
+
+    asyncio.run(_run())
     console.print(f"[bold cyan]Task: {task}[/bold cyan]")
     console.print(f"[bold yellow]Neuron: {neuron}[/bold yellow]")
 
 
 @main.command()
-def status():
+@click.option('--watch', 'watch_', is_flag=True, help='Keep refreshing live metrics')
+@click.option('--host', default=DEFAULT_HOST, help='Coordinator host')
+@click.option('--port', default=DEFAULT_PORT, type=int, help='Coordinator port')
+@click.option('--refresh', default=2.0, type=click.FloatRange(min=0, min_open=True),
+              help='Refreshes per second with --watch')
+@click.option('--count', default=None, type=int, help='Stop after this many refreshes')
+def status(watch_: bool, host: str, port: int, refresh: float, count: Optional[int]):
     """Check the status of neurons"""
-    table = Table(title="Neuron Status")
-    table.add_column("Neuron", style="cyan", justify="center")
-    table.add_column("Status", style="green", justify="center")
-    table.add_column("Uptime", style="blue", justify="center")
+    if watch_:
+        try:
+            asyncio.run(watch(console, lambda: fetch_status(host, port), refresh, count))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    try:
+        snapshot = asyncio.run(fetch_status(host, port))
+    except (OSError, asyncio.TimeoutError, ValueError) as exc:
+        reason = str(exc) or type(exc).__name__
+        console.print(f"[bold red]No coordinator at {host}:{port} ({reason})[/bold red]")
+        raise SystemExit(1)
+    console.print(render_status(status_rows(snapshot), snapshot))
 
-    table.add_row("Primary", "🟢 Active", "2h 34m 12s")
-    table.add_row("Secondary", "🟡 Idle", "45m 20s")
 
+@main.command()
+@click.option('--from', 'from_', type=click.Choice(['primary', 'secondary']), default='primary',
+              help='Neuron that runs each task first')
+@click.option('--to', type=click.Choice(['primary', 'secondary']), default='secondary',
+              help='Neuron that runs each task second')
+@click.option('--task', 'tasks', multiple=True, help='Task to chain (repeatable)')
+@click.option('--tasks-file', type=click.File('r'), help='File with one task per line')
+@click.option('--sink', type=click.Choice(list(SINKS)), default='memory',
+              help='Where to write results')
+@click.option('--output', help='Output path for ndjson, sqlite and columnar sinks')
+@click.option('--batch-size', default=1000, type=click.IntRange(min=1),
+              help='Results written per batch')
+@click.option('--concurrency', default=1, type=click.IntRange(min=1),
+              help='Tasks in flight at once')
+@click.option('--retries', default=0, type=click.IntRange(min=0),
+              help='Retries for each failed step')
+def chain(from_: str, to: str, tasks: Tuple[str, ...], tasks_file, sink: str,
+          output: Optional[str], batch_size: int, concurrency: int, retries: int):
+    """Chain tasks between neurons"""
+    if not tasks and tasks_file is None:
+        console.print("[bold purple]Task chaining enabled[/bold purple]")
+        console.print("Use --from and --to options to specify neurons")
+        return
+    if from_ == to:
+        console.print("[bold red]--from and --to must be different neurons[/bold red]")
+        raise SystemExit(1)
+    try:
+        result_sink = create_sink(sink, output, batch_size)
+    except ValueError as exc:
+        console.print(f"[bold red]{exc}[/bold red]")
+        raise SystemExit(1)
+
+    def _tasks() -> Iterator[str]:
+        yield from tasks
+        if tasks_file is not None:
+            for line in tasks_file:
+                if line.strip():
+                    yield line.strip()
+
+    with result_sink:
+        summary = asyncio.run(
+            TaskExecutor().stream_chain_tasks(
+                _tasks(), f"{from_}_to_{to}", result_sink, concurrency, retries
+            )
+        )
+
+    table = Table(title=f"Chain Results ({summary.total} total)")
+    table.add_column("By", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_column("Results", style="blue", justify="right")
+    for name, count in sorted(summary.by_neuron.items()):
+        table.add_row("neuron", name, str(count))
+    for status, count in sorted(summary.by_status.items()):
+        table.add_row("status", status, str(count))
     console.print(table)
+    if output:
+        console.print(f"[bold green]Results written to {output}[/bold green]")
 
 
 @main.command()
-def chain():
-    """Chain tasks between neurons"""
-    console.print("[bold purple]Task chaining enabled[/bold purple]")
-    console.print("Use --from and --to options to specify neurons")
+@click.option('--tasks', 'task_count', default=1000, type=click.IntRange(min=0),
+              help='Number of tasks to chain')
+@click.option('--chain', 'chain_type', default='primary_to_secondary',
+              type=click.Choice(list(CHAIN_TYPES)), help='How each task is chained')
+@click.option('--concurrency', default=10, type=click.IntRange(min=1),
+              help='Tasks in flight at once')
+@click.option('--retries', default=0, type=click.IntRange(min=0),
+              help='Retries for each failed step')
+@click.option('--distribution', default='exponential', type=click.Choice(list(DISTRIBUTIONS)),
+              help='Neuron latency distribution')
+@click.option('--failure-rate', default=0.0, type=click.FloatRange(0, 1),
+              help='Probability a step fails')
+@click.option('--latency', 'latencies', multiple=True, callback=_per_neuron,
+              metavar='NEURON=SECONDS', help='Mean latency of one neuron (repeatable)')
+@click.option('--neuron-failure-rate', 'failure_rates', multiple=True, callback=_per_neuron,
+              metavar='NEURON=RATE', help='Failure rate of one neuron (repeatable)')
+@click.option('--seed', default=0, type=int, help='Random seed for a reproducible run')
+@click.option('--sink', type=click.Choice(list(SINKS)), default='memory',
+              help='Where to write results')
+@click.option('--output', help='Output path for ndjson, sqlite and columnar sinks')
+def simulate(task_count: int, chain_type: str, concurrency: int, retries: int,
+             distribution: str, failure_rate: float, seed: int, sink: str,
+             output: Optional[str], latencies: Dict[str, float],
+             failure_rates: Dict[str, float]):
+    """Simulate a workload on virtual time for capacity planning"""
+    try:
+        result_sink = create_sink(sink, output)
+    except ValueError as exc:
+        console.print(f"[bold red]{exc}[/bold red]")
+        raise SystemExit(1)
+
+    with result_sink:
+        try:
+            report = run_simulation(
+                (f"task_{i}" for i in range(task_count)), chain_type, concurrency, retries,
+                distribution, failure_rate, seed, result_sink, latencies, failure_rates
+            )
+        except ValueError as exc:
+            raise click.UsageError(str(exc))
+
+    table = Table(title="Simulation Report")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="green", justify="right")
+    table.add_row("Results", str(report.summary.total))
+    for status, count in sorted(report.summary.by_status.items()):
+        table.add_row(f"  {status}", str(count))
+    table.add_row("Retries", str(report.retries))
+    table.add_row("Virtual time", f"{report.virtual_seconds:.1f}s")
+    table.add_row("Wall time", f"{report.wall_seconds:.2f}s")
+    table.add_row("Throughput", f"{report.throughput:.1f}/s")
+    console.print(table)
+    console.print(render_status(status_rows(report.snapshot), report.snapshot))
 
 
 @main.command()
@@ -71,6 +218,27 @@ def workflow_create(name: str):
     console.print(f"[bold green]Workflow '{name}' created successfully![/bold green]")
 
 
+@main.command()
+@click.option('--host', default=DEFAULT_HOST, help='Coordinator host')
+@click.option('--port', default=DEFAULT_PORT, type=int, help='Coordinator port')
+@click.option('--concurrency', default=4, type=click.IntRange(min=1),
+              help='Jobs to execute at once')
+@click.option('--prefetch', default=1, type=click.IntRange(min=0),
+              help='Extra jobs to buffer ahead')
+def worker(host: str, port: int, concurrency: int, prefetch: int):
+    """Execute tasks handed out by a coordinator"""
+    console.print(f"[bold green]Worker connecting to {host}:{port}[/bold green]")
+    try:
+        asyncio.run(Worker(host, port, concurrency=concurrency, prefetch=prefetch).run())
+    except OSError as exc:
+        console.print(f"[bold red]Cannot reach coordinator: {exc}[/bold red]")
+        raise SystemExit(1)
+    except ProtocolError as exc:
+        console.print(f"[bold red]{exc}[/bold red]")
+        raise SystemExit(1)
+    console.print("[bold yellow]Coordinator closed the connection[/bold yellow]")
+
+
 @main.command()
 def config_show():
     """Show current configuration"""
@@ -0,0 +1,98 @@
+"""Live terminal dashboard for neuron metrics"""
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from rich.console import Console, RenderableType
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+
+from .metrics import percentile
+
+Snapshot = Dict[str, Any]
+SnapshotSource = Callable[[], Union[Snapshot, Awaitable[Snapshot]]]
+
+STATUS_ICONS = {
+    "processing": "🔵 Processing",
+    "active": "🟢 Active",
+    "idle": "🟡 Idle",
+}
+
+
+def status_rows(snapshot: Snapshot) -> Tuple[Tuple[str, ...], ...]:
+    """Format a snapshot into table rows, one per neuron"""
+    rows = []
+    for name, stats in sorted(snapshot.get("neurons", {}).items()):
+        histogram = stats["latency_histogram"]
+        rows.append((
+            name,
+            STATUS_ICONS.get(stats.get("status"), stats.get("status", "-")),
+            str(stats["in_flight"]),
+            str(stats["completed"]),
+            f"{stats['throughput']:.1f}/s",
+            f"{percentile(histogram, 0.50) * 1000:.0f}ms",
+            f"{percentile(histogram, 0.95) * 1000:.0f}ms",
+            f"{percentile(histogram, 0.99) * 1000:.0f}ms",
+        ))
+    return tuple(rows)
+
+
+def render_status(rows: Tuple[Tuple[str, ...], ...], snapshot: Snapshot) -> Table:
+    """Build the status table for formatted rows"""
+    caption = f"Queue depth: {snapshot.get('queue_depth', 0)}"
+    if "workers" in snapshot:
+        caption += f"  Workers: {snapshot['workers']}"
+    table = Table(title="Neuron Status", caption=caption)
+    table.add_column("Neuron", style="cyan", justify="center")
+    table.add_column("Status", style="green", justify="center")
+    table.add_column("In-flight", style="yellow", justify="right")
+    table.add_column("Completed", style="blue", justify="right")
+    table.add_column("Throughput", style="blue", justify="right")
+    table.add_column("p50", style="magenta", justify="right")
+    table.add_column("p95", style="magenta", justify="right")
+    table.add_column("p99", style="magenta", justify="right")
+    for row in rows:
+        table.add_row(*row)
+    return table
+
+
+async def watch(console: Console, source: SnapshotSource, refresh: float = 2.0,
+                count: Optional[int] = None,
+                until: Optional[Callable[[], bool]] = None) -> None:
+    """Redraw the status table ``refresh`` times per second
+
+    The screen is only repainted when the formatted rows change, so an idle
+    or steady dashboard costs one snapshot per tick and nothing else.
+    ``source`` may return a snapshot or an awaitable of one; connection
+    and protocol errors show a waiting panel instead. Stops after ``count`` ticks or
+    once ``until()`` is true.
+    """
+    if refresh <= 0:
+        raise ValueError(f"refresh must be positive, got {refresh}")
+    previous: Any = None
+    ticks = 0
+    with Live(console=console, auto_refresh=False) as live:
+        while True:
+            try:
+                snapshot = source()
+                if inspect.isawaitable(snapshot):
+                    snapshot = await snapshot
+                rows = status_rows(snapshot)
+                key: Any = (rows, snapshot.get("queue_depth"), snapshot.get("workers"))
+            except (OSError, asyncio.TimeoutError, ValueError) as exc:
+                snapshot, key = None, str(exc)
+            if key != previous:
+                if snapshot is None:
+                    view: RenderableType = Panel(
+                        f"[yellow]Waiting for metrics: {key}[/yellow]", title="Neuron Status"
+                    )
+                else:
+                    view = render_status(rows, snapshot)
+                live.update(view, refresh=True)
+                previous = key
+            ticks += 1
+            if (count is not None and ticks >= count) or (until is not None and until()):
+                break
+            await asyncio.sleep(1.0 / refresh)
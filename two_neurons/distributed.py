@@ -0,0 +1,578 @@
+"""Distributed coordinator/worker execution for Two Neurons
+
+A coordinator accepts TCP connections from ``two-neurons worker`` processes
+and shards jobs across them. A job is an ordered list of (neuron, task)
+steps that runs on a single worker, e.g. one task of ``chain_tasks`` or one
+whole workflow shipped as a compiled ``ExecutionPlan``. Messages are
+newline-delimited JSON objects.
+
+Workers pull work through credits: each one advertises ``concurrency``
+execution slots plus a small ``prefetch`` backlog. When the coordinator runs
+out of pending jobs, idle workers steal backlogged jobs that a busy worker
+has not started yet. Workers send heartbeats; a worker that disconnects or
+stays silent past ``heartbeat_timeout`` is dropped and its unfinished jobs
+are handed to the remaining workers; stopping the coordinator cancels them
+instead. A message longer than ``max_message_size`` fails its job instead of
+breaking the connection. Heartbeats also carry each worker's executor
+metrics, which the coordinator merges for ``two-neurons status``.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import socket
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .chain import ExecutionPlan, TaskChain
+from .executor import TaskExecutor, chain_steps
+from .metrics import merge_snapshots
+from .sinks import ResultSink, ResultSummary
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7878
+HEARTBEAT_INTERVAL = 2.0
+HEARTBEAT_TIMEOUT = 10.0
+PLAN_CACHE_SIZE = 256
+STREAM_WINDOW = 1000
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+Step = Tuple[str, str]
+
+_JOB_ID = re.compile(rb'"job_id": (\d+)')
+
+
+class ProtocolError(ValueError):
+    """Raised when a peer breaks the coordinator/worker protocol"""
+
+
+class MessageTooLargeError(ProtocolError):
+    """Raised for a message longer than the protocol maximum"""
+
+    def __init__(self, size: int, limit: int, job_id: Optional[int] = None):
+        super().__init__(
+            f"message of {size} bytes exceeds the protocol maximum of {limit} bytes"
+        )
+        self.job_id = job_id
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message).encode() + b"\n"
+
+
+def _write(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+    """Queue one protocol message on a stream"""
+    writer.write(_encode(message))
+
+
+async def _read(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read one protocol message, or None once the peer has gone away
+
+    A line longer than the stream limit is skipped in full and reported as
+    ``MessageTooLargeError``, leaving the stream positioned at the next
+    message. Anything other than a JSON object raises ``ProtocolError``.
+    """
+    try:
+        line = await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError as exc:
+        head = await reader.read(exc.consumed)
+        size = len(head)
+        while True:
+            try:
+                size += len(await reader.readuntil(b"\n"))
+                break
+            except asyncio.LimitOverrunError as more:
+                size += len(await reader.read(more.consumed))
+            except asyncio.IncompleteReadError as more:
+                size += len(more.partial)
+                break
+        match = _JOB_ID.search(head[:256])
+        raise MessageTooLargeError(
+            size, exc.consumed, int(match.group(1)) if match else None
+        ) from None
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ProtocolError(f"expected a JSON object, got {type(message).__name__}")
+    return message
+
+
+async def fetch_status(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                       timeout: float = 5.0,
+                       max_message_size: int = MAX_MESSAGE_SIZE) -> Dict[str, Any]:
+    """Ask a running coordinator for its live metrics"""
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port, limit=max_message_size), timeout
+    )
+    try:
+        _write(writer, {"type": "status"})
+        snapshot = await asyncio.wait_for(_read(reader), timeout)
+    finally:
+        writer.close()
+    if snapshot is None:
+        raise ConnectionError("coordinator closed the connection")
+    return snapshot
+
+
+class _Job:
+    """A unit of work tracked by the coordinator"""
+
+    def __init__(self, job_id: int, payload: Dict[str, Any],
+                 future: "asyncio.Future[List[Dict[str, Any]]]"):
+        self.job_id = job_id
+        self.message = _encode({"type": "job", "job_id": job_id, **payload})
+        self.future = future
+
+
+class _WorkerHandle:
+    """Coordinator-side view of a connected worker"""
+
+    def __init__(self, worker_id: str, writer: asyncio.StreamWriter,
+                 concurrency: int, prefetch: int):
+        self.worker_id = worker_id
+        self.writer = writer
+        self.concurrency = concurrency
+        self.prefetch = prefetch
+        self.queued: Dict[int, _Job] = {}
+        self.running: Dict[int, _Job] = {}
+        self.completed = 0
+        self.last_seen = time.monotonic()
+        self.stats: Dict[str, Any] = {}
+
+    @property
+    def free(self) -> int:
+        """Jobs this worker can still accept, backlog included"""
+        return self.concurrency + self.prefetch - len(self.queued) - len(self.running)
+
+    @property
+    def idle_slots(self) -> int:
+        """Execution slots with nothing assigned to them"""
+        return max(self.concurrency - len(self.queued) - len(self.running), 0)
+
+
+class Coordinator:
+    """Shard jobs across connected workers"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+                 max_message_size: int = MAX_MESSAGE_SIZE):
+        self.host = host
+        self.port = port
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_message_size = max_message_size
+        self.workers: Dict[str, _WorkerHandle] = {}
+        self._pending: Deque[_Job] = deque()
+        self._stealing: Set[int] = set()
+        self._job_ids = itertools.count(1)
+        self._worker_ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def start(self) -> None:
+        """Start listening for workers"""
+        self._closing = False
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=self.max_message_size
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._monitor = asyncio.ensure_future(self._monitor_heartbeats())
+
+    async def stop(self) -> None:
+        """Shut down workers and stop listening, cancelling unfinished jobs"""
+        self._closing = True
+        if self._monitor:
+            self._monitor.cancel()
+        for worker in list(self.workers.values()):
+            _write(worker.writer, {"type": "shutdown"})
+            self._drop_worker(worker)
+        for job in self._pending:
+            job.future.cancel()
+        self._pending.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "Coordinator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def wait_for_workers(self, count: int, timeout: Optional[float] = None) -> None:
+        """Wait until at least ``count`` workers are connected"""
+        async def _wait():
+            while len(self.workers) < count:
+                await asyncio.sleep(0.05)
+        await asyncio.wait_for(_wait(), timeout)
+
+    def submit(self, steps: Iterable[Step],
+               custom: Sequence[str] = ()) -> "asyncio.Future[List[Dict[str, Any]]]":
+        """Queue a job and return a future for its step results"""
+        return self._submit({"steps": [list(step) for step in steps], "custom": list(custom)})
+
+    def submit_plan(self, plan: ExecutionPlan) -> "asyncio.Future[List[Dict[str, Any]]]":
+        """Queue a compiled plan as one job"""
+        return self._submit({"plan": plan.to_dict()})
+
+    async def run_jobs(self, jobs: Iterable[Iterable[Step]]) -> List[List[Dict[str, Any]]]:
+        """Run jobs across workers, returning results in submission order"""
+        return list(await asyncio.gather(*(self.submit(steps) for steps in jobs)))
+
+    async def chain_tasks(self, tasks: List[str], chain_type: str) -> List[Dict[str, Any]]:
+        """Distributed counterpart of ``TaskExecutor.chain_tasks``"""
+        results = await self.run_jobs(chain_steps(task, chain_type) for task in tasks)
+        return [result for job_results in results for result in job_results]
+
+    async def stream_chain_tasks(self, tasks: Iterable[str], chain_type: str,
+                                 sink: ResultSink,
+                                 window: int = STREAM_WINDOW) -> ResultSummary:
+        """Chain tasks across workers, writing results to ``sink`` as jobs finish
+
+        At most ``window`` jobs are outstanding at once, so memory stays
+        bounded for arbitrarily long task streams. Results arrive in
+        completion order rather than submission order.
+        """
+        in_flight: Set["asyncio.Future[List[Dict[str, Any]]]"] = set()
+        tasks = iter(tasks)
+        while True:
+            for task in tasks:
+                in_flight.add(self.submit(chain_steps(task, chain_type)))
+                if len(in_flight) >= window:
+                    break
+            if not in_flight:
+                break
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    sink.add(result)
+        sink.flush()
+        return sink.summary
+
+    async def execute_chains(self, chains: Iterable[TaskChain]) -> List[List[Dict[str, Any]]]:
+        """Run each chain as one job, returning one result list per chain"""
+        plans = [chain.compile() for chain in chains]
+        return list(await asyncio.gather(*(self.submit_plan(plan) for plan in plans)))
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Get live metrics merged from every connected worker"""
+        workers = list(self.workers.values())
+        neurons = merge_snapshots([worker.stats for worker in workers])
+        for stats in neurons.values():
+            stats["status"] = "processing" if stats["in_flight"] else "idle"
+        return {
+            "queue_depth": len(self._pending) + sum(len(w.queued) for w in workers),
+            "workers": len(workers),
+            "neurons": neurons
+        }
+
+    def _submit(self, payload: Dict[str, Any]) -> "asyncio.Future[List[Dict[str, Any]]]":
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(next(self._job_ids), payload, future)
+        if self._closing:
+            future.cancel()
+            return future
+        if len(job.message) > self.max_message_size:
+            future.set_exception(MessageTooLargeError(len(job.message), self.max_message_size))
+            return future
+        self._pending.append(job)
+        self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        """Hand pending jobs to the workers with the most spare capacity"""
+        while self._pending:
+            worker = max(
+                self.workers.values(),
+                key=lambda w: (w.idle_slots, w.free),
+                default=None
+            )
+            if worker is None or worker.free <= 0:
+                break
+            job = self._pending.popleft()
+            if job.future.done():
+                continue
+            worker.queued[job.job_id] = job
+            worker.writer.write(job.message)
+        if not self._pending:
+            self._steal()
+
+    def _steal(self) -> None:
+        """Ask busy workers to give up backlogged jobs for idle ones"""
+        wanted = sum(w.idle_slots for w in self.workers.values()) - len(self._stealing)
+        if wanted <= 0:
+            return
+        backlogs = []
+        for worker in self.workers.values():
+            if worker.idle_slots:
+                continue
+            stealable = [job_id for job_id in worker.queued if job_id not in self._stealing]
+            if stealable:
+                backlogs.append((worker, stealable))
+        # Take from whoever has the longest backlog
+        while wanted > 0 and backlogs:
+            worker, stealable = max(backlogs, key=lambda b: len(b[1]))
+            job_id = stealable.pop()
+            if not stealable:
+                backlogs.remove((worker, stealable))
+            self._stealing.add(job_id)
+            _write(worker.writer, {"type": "steal", "job_id": job_id})
+            wanted -= 1
+
+    def _on_message(self, worker: _WorkerHandle, message: Dict[str, Any]) -> None:
+        """Apply one message received from a worker"""
+        kind = message.get("type")
+        job_id = message.get("job_id")
+        if kind == "heartbeat":
+            worker.stats = message.get("stats", worker.stats)
+        elif kind == "started":
+            self._stealing.discard(job_id)
+            job = worker.queued.pop(job_id, None)
+            if job:
+                worker.running[job_id] = job
+        elif kind == "stolen":
+            self._stealing.discard(job_id)
+            job = worker.queued.pop(job_id, None)
+            if job:
+                self._pending.appendleft(job)
+                self._dispatch()
+        elif kind in ("result", "failed"):
+            self._stealing.discard(job_id)
+            job = worker.running.pop(job_id, None) or worker.queued.pop(job_id, None)
+            if job:
+                worker.completed += 1
+                if job.future.done():
+                    pass
+                elif kind == "result":
+                    job.future.set_result(message.get("results", []))
+                else:
+                    job.future.set_exception(ProtocolError(message.get("error", "job failed")))
+                self._dispatch()
+
+    def _fail_oversized(self, worker: _WorkerHandle, exc: MessageTooLargeError) -> None:
+        """Fail the job whose message overran the stream limit"""
+        job = worker.running.pop(exc.job_id, None) or worker.queued.pop(exc.job_id, None)
+        if job:
+            self._stealing.discard(job.job_id)
+            if not job.future.done():
+                job.future.set_exception(exc)
+            self._dispatch()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        """Serve a status request, or a worker until it goes away"""
+        try:
+            hello = await _read(reader)
+        except (ConnectionError, ValueError):
+            hello = None
+        if hello and hello.get("type") == "status":
+            _write(writer, self.get_snapshot())
+            writer.close()
+            return
+        if not hello or hello.get("type") != "hello":
+            writer.close()
+            return
+        concurrency = hello.get("concurrency")
+        prefetch = hello.get("prefetch", 0)
+        if not isinstance(concurrency, int) or concurrency < 1:
+            reason = f"concurrency must be a positive integer, got {concurrency!r}"
+        elif not isinstance(prefetch, int) or prefetch < 0:
+            reason = f"prefetch must be a non-negative integer, got {prefetch!r}"
+        else:
+            reason = None
+        if reason:
+            _write(writer, {"type": "rejected", "reason": reason})
+            writer.close()
+            return
+
+        worker = _WorkerHandle(
+            f"{hello.get('name', 'worker')}-{next(self._worker_ids)}",
+            writer,
+            concurrency,
+            prefetch
+        )
+        self.workers[worker.worker_id] = worker
+        self._dispatch()
+        try:
+            while True:
+                try:
+                    message = await _read(reader)
+                except MessageTooLargeError as exc:
+                    worker.last_seen = time.monotonic()
+                    self._fail_oversized(worker, exc)
+                    continue
+                if message is None:
+                    break
+                worker.last_seen = time.monotonic()
+                self._on_message(worker, message)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._drop_worker(worker)
+
+    def _drop_worker(self, worker: _WorkerHandle) -> None:
+        """Forget a worker and reassign its unfinished jobs
+
+        While the coordinator is stopping there is nobody left to reassign
+        them to, so they are cancelled instead.
+        """
+        if self.workers.get(worker.worker_id) is not worker:
+            return
+        del self.workers[worker.worker_id]
+        worker.writer.close()
+        orphaned = list(worker.running.values()) + list(worker.queued.values())
+        worker.running.clear()
+        worker.queued.clear()
+        for job in reversed(orphaned):
+            self._stealing.discard(job.job_id)
+            if self._closing:
+                job.future.cancel()
+            elif not job.future.done():
+                self._pending.appendleft(job)
+        if not self._closing:
+            self._dispatch()
+
+    async def _monitor_heartbeats(self) -> None:
+        """Drop workers whose heartbeats have stopped"""
+        while True:
+            await asyncio.sleep(self.heartbeat_timeout / 4)
+            deadline = time.monotonic() - self.heartbeat_timeout
+            for worker in list(self.workers.values()):
+                if worker.last_seen < deadline:
+                    self._drop_worker(worker)
+
+
+class Worker:
+    """Execute jobs handed out by a coordinator"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 concurrency: int = 4, prefetch: int = 1,
+                 heartbeat_interval: float = HEARTBEAT_INTERVAL,
+                 executor: Optional[TaskExecutor] = None, name: Optional[str] = None,
+                 max_message_size: int = MAX_MESSAGE_SIZE):
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        if prefetch < 0:
+            raise ValueError(f"prefetch must not be negative, got {prefetch}")
+        self.host = host
+        self.port = port
+        self.concurrency = concurrency
+        self.prefetch = prefetch
+        self.heartbeat_interval = heartbeat_interval
+        self.executor = executor or TaskExecutor()
+        self.name = name or socket.gethostname()
+        self.max_message_size = max_message_size
+        self.completed = 0
+        self._backlog: Deque[Dict[str, Any]] = deque()
+        self._plans: Dict[str, ExecutionPlan] = {}
+        self._available: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+
+    async def run(self) -> None:
+        """Serve jobs until the coordinator shuts down or disconnects"""
+        self._available = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, limit=self.max_message_size
+        )
+        await self._send({
+            "type": "hello",
+            "name": self.name,
+            "concurrency": self.concurrency,
+            "prefetch": self.prefetch
+        })
+        tasks = [asyncio.ensure_future(self._heartbeat())]
+        tasks += [asyncio.ensure_future(self._run_jobs()) for _ in range(self.concurrency)]
+        try:
+            while True:
+                try:
+                    message = await _read(reader)
+                except MessageTooLargeError as exc:
+                    if exc.job_id is not None:
+                        await self._send(
+                            {"type": "failed", "job_id": exc.job_id, "error": str(exc)}
+                        )
+                    continue
+                if message is None or message.get("type") == "shutdown":
+                    break
+                if message.get("type") == "rejected":
+                    raise ProtocolError(f"coordinator rejected worker: {message.get('reason')}")
+                self._on_message(message)
+        except (ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._writer.close()
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        """Apply one message received from the coordinator"""
+        kind = message.get("type")
+        if kind in ("job", "steal") and not isinstance(message.get("job_id"), int):
+            raise ProtocolError(f"{kind} message without an integer job_id")
+        if kind == "job":
+            self._backlog.append(message)
+            self._available.set()
+        elif kind == "steal":
+            for job in self._backlog:
+                if job["job_id"] == message["job_id"]:
+                    self._backlog.remove(job)
+                    _write(self._writer, {"type": "stolen", "job_id": job["job_id"]})
+                    break
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        async with self._write_lock:
+            _write(self._writer, message)
+            await self._writer.drain()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await self._send({"type": "heartbeat", "stats": self.executor.get_snapshot()})
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _run_jobs(self) -> None:
+        """Execution slot: take jobs from the backlog one at a time"""
+        while True:
+            while not self._backlog:
+                self._available.clear()
+                await self._available.wait()
+            job = self._backlog.popleft()
+            await self._send({"type": "started", "job_id": job["job_id"]})
+            try:
+                results = await self._execute(job)
+            except Exception as exc:
+                results = [{"error": f"{type(exc).__name__}: {exc}"}]
+            message = _encode({"type": "result", "job_id": job["job_id"], "results": results})
+            if len(message) > self.max_message_size:
+                error = MessageTooLargeError(len(message), self.max_message_size)
+                message = _encode({"type": "failed", "job_id": job["job_id"], "error": str(error)})
+            async with self._write_lock:
+                self._writer.write(message)
+                await self._writer.drain()
+            self.completed += 1
+
+    async def _execute(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run one job's steps and collect their results"""
+        if "plan" in job:
+            return await self._load_plan(job["plan"]).run()
+        for name in job.get("custom", []):
+            self.executor.add_custom_neuron(name)
+        results = []
+        for neuron_name, task in job["steps"]:
+            results.append(await self.executor.execute_task(task, neuron_name))
+        return results
+
+    def _load_plan(self, data: Dict[str, Any]) -> ExecutionPlan:
+        """Load a plan, reusing one already resolved against this executor"""
+        plan = self._plans.get(data["plan_id"])
+        if plan is None:
+            if len(self._plans) >= PLAN_CACHE_SIZE:
+                self._plans.clear()
+            plan = self._plans[data["plan_id"]] = ExecutionPlan.from_dict(data, self.executor)
+        return plan
@@ -1,9 +1,24 @@
 """Task executor for Two Neurons"""
 
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Iterable, Optional, Sized, Tuple
+from .metrics import ExecutorStats
+from .sinks import MemorySink, ResultSink, ResultSummary
 from .neuron import Neuron, PrimaryNeuron, SecondaryNeuron, CustomNeuron, NeuronType
 
 
+CHAIN_TYPES = ("primary_to_secondary", "secondary_to_primary")
+
+
+def chain_steps(task: str, chain_type: str) -> List[Tuple[str, str]]:
+    """Expand a chained task into its (neuron, task) steps"""
+    if chain_type == "primary_to_secondary":
+        return [("primary", task), ("secondary", f"validate_{task}")]
+    elif chain_type == "secondary_to_primary":
+        return [("secondary", task), ("primary", f"execute_{task}")]
+    return []
+
+
 class TaskExecutor:
     """Executor for neuron tasks"""
 
@@ -11,6 +26,7 @@ class TaskExecutor:
         self.primary = PrimaryNeuron()
         self.secondary = SecondaryNeuron()
         self.custom_neurons: Dict[str, CustomNeuron] = {}
+        self.stats = ExecutorStats()
 
     def add_custom_neuron(self, name: str) -> None:
         """Add a custom neuron"""
@@ -30,24 +46,60 @@ class TaskExecutor:
         neuron = self.get_neuron(neuron_name)
         if not neuron:
             return {"error": f"Neuron '{neuron_name}' not found"}
-        return await neuron.process(task)
+        return await self.process(neuron, task)
+
+    async def process(self, neuron: Neuron, task: str) -> Dict[str, Any]:
+        """Process a task on a neuron, recording its latency"""
+        stats = self.stats.for_neuron(neuron.name)
+        started = stats.start()
+        try:
+            return await neuron.process(task)
+        finally:
+            stats.finish(started)
 
     async def chain_tasks(self, tasks: List[str], chain_type: str) -> List[Dict[str, Any]]:
         """Chain tasks between neurons"""
-        results = []
-        if chain_type == "primary_to_secondary":
-            for task in tasks:
-                primary_result = await self.primary.process(task)
-                results.append(primary_result)
-                secondary_result = await self.secondary.process(f"validate_{task}")
-                results.append(secondary_result)
-        elif chain_type == "secondary_to_primary":
-            for task in tasks:
-                secondary_result = await self.secondary.process(task)
-                results.append(secondary_result)
-                primary_result = await self.primary.process(f"execute_{task}")
-                results.append(primary_result)
-        return results
+        sink = MemorySink()
+        await self.stream_chain_tasks(tasks, chain_type, sink)
+        return sink.results
+
+    async def stream_chain_tasks(self, tasks: Iterable[str], chain_type: str,
+                                 sink: ResultSink, concurrency: int = 1,
+                                 retries: int = 0) -> ResultSummary:
+        """Chain tasks between neurons, writing each result to ``sink``
+
+        Up to ``concurrency`` tasks are chained at once; the steps of one task
+        always run in order. A step whose result has status "failed" is run
+        again up to ``retries`` times, and only its last result is written.
+        With more than one task in flight, results arrive in completion order.
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        if retries < 0:
+            raise ValueError(f"retries must not be negative, got {retries}")
+        total = len(tasks) if isinstance(tasks, Sized) else 0
+        pending = iter(tasks)
+        started = 0
+
+        async def _slot():
+            nonlocal started
+            for task in pending:
+                steps = chain_steps(task, chain_type)
+                for neuron_name, step_task in steps:
+                    started += 1
+                    self.stats.queue_depth = max(total * len(steps) - started, 0)
+                    neuron = self.get_neuron(neuron_name)
+                    result = await self.process(neuron, step_task)
+                    for _ in range(retries):
+                        if result.get("status") != "failed":
+                            break
+                        self.stats.retries += 1
+                        result = await self.process(neuron, step_task)
+                    sink.add(result)
+
+        await asyncio.gather(*(_slot() for _ in range(concurrency)))
+        sink.flush()
+        return sink.summary
 
     def get_all_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all neurons"""
@@ -56,3 +108,13 @@ class TaskExecutor:
             "secondary": self.secondary.get_status(),
             **{name: neuron.get_status() for name, neuron in self.custom_neurons.items()}
         }
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Get live metrics for every neuron"""
+        statuses = self.get_all_status().values()
+        for status in statuses:
+            self.stats.for_neuron(status["name"])
+        snapshot = self.stats.snapshot()
+        for status in statuses:
+            snapshot["neurons"][status["name"]]["status"] = status["status"]
+        return snapshot
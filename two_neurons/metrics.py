@@ -0,0 +1,131 @@
+"""Runtime metrics for neuron task execution"""
+
+import asyncio
+import bisect
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+THROUGHPUT_WINDOW = 10
+
+# Latency histogram bucket upper bounds: 1ms to ~3h in steps of 2**0.25 (~19%)
+LATENCY_BUCKETS = [0.001 * 2 ** (i / 4) for i in range(96)]
+
+
+def _now() -> float:
+    """Current time on the running event loop's clock (virtual under simulation)"""
+    try:
+        return asyncio.get_running_loop().time()
+    except RuntimeError:
+        return time.monotonic()
+
+
+class NeuronStats:
+    """In-flight count, throughput and a latency histogram for one neuron"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.completed = 0
+        # One count per LATENCY_BUCKETS bound, plus one for anything slower
+        self.latency_histogram: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._buckets: Deque[List[int]] = deque()
+
+    def start(self) -> float:
+        """Record a task starting and return its start time"""
+        self.in_flight += 1
+        return _now()
+
+    def finish(self, started: float) -> None:
+        """Record a task started at ``started`` finishing"""
+        now = _now()
+        self.in_flight -= 1
+        self.completed += 1
+        self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS, now - started)] += 1
+        second = int(now)
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += 1
+        else:
+            self._buckets.append([second, 1])
+            self._expire(second)
+
+    def throughput(self) -> float:
+        """Completed tasks per second over the recent window"""
+        self._expire(int(_now()))
+        return sum(count for _, count in self._buckets) / THROUGHPUT_WINDOW
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "throughput": self.throughput(),
+            "latency_histogram": list(self.latency_histogram)
+        }
+
+    def _expire(self, second: int) -> None:
+        while self._buckets and self._buckets[0][0] <= second - THROUGHPUT_WINDOW:
+            self._buckets.popleft()
+
+
+class ExecutorStats:
+    """Per-neuron statistics, the depth of the task queue and retries run"""
+
+    def __init__(self):
+        self.neurons: Dict[str, NeuronStats] = {}
+        self.queue_depth = 0
+        self.retries = 0
+
+    def for_neuron(self, name: str) -> NeuronStats:
+        """Get the stats for a neuron, creating them on first use"""
+        stats = self.neurons.get(name)
+        if stats is None:
+            stats = self.neurons[name] = NeuronStats()
+        return stats
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-data view of the stats, safe to serialize"""
+        return {
+            "queue_depth": self.queue_depth,
+            "neurons": {name: stats.snapshot() for name, stats in self.neurons.items()}
+        }
+
+
+def percentile(histogram: List[int], fraction: float) -> float:
+    """Approximate percentile from a latency histogram (0.0 when empty)
+
+    Returns the geometric midpoint of the bucket holding the requested rank.
+    """
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    rank = max(math.ceil(fraction * total), 1)
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            break
+    if index == 0:
+        return LATENCY_BUCKETS[0]
+    if index >= len(LATENCY_BUCKETS):
+        return LATENCY_BUCKETS[-1]
+    return math.sqrt(LATENCY_BUCKETS[index - 1] * LATENCY_BUCKETS[index])
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combine per-neuron snapshots from several executors"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, stats in snapshot.get("neurons", {}).items():
+            total = merged.setdefault(name, {
+                "in_flight": 0,
+                "completed": 0,
+                "throughput": 0.0,
+                "latency_histogram": [0] * (len(LATENCY_BUCKETS) + 1)
+            })
+            total["in_flight"] += stats["in_flight"]
+            total["completed"] += stats["completed"]
+            total["throughput"] += stats["throughput"]
+            total["latency_histogram"] = [
+                a + b for a, b in zip(total["latency_histogram"], stats["latency_histogram"])
+            ]
+    return merged
@@ -0,0 +1,235 @@
+"""Deterministic simulation with virtual time for load testing
+
+``VirtualTimeLoop`` is an asyncio event loop whose clock only moves when
+every coroutine is waiting on a timer: instead of sleeping, it jumps straight
+to the next deadline. Any ``asyncio.sleep`` in a neuron therefore costs no
+wall time, and a run is reproducible as long as its randomness is seeded.
+
+``SimulatedNeuron`` draws latencies from a configurable distribution around
+a per-neuron mean and fails at a per-neuron rate. ``simulate`` drives a
+chained workload through a ``SimulatedExecutor`` using the executor's own
+streaming scheduler, with its concurrency limit and retries.
+"""
+
+import asyncio
+import random
+import selectors
+import time
+from typing import Any, Callable, Coroutine, Dict, Iterable, Optional, TypeVar
+
+from .executor import CHAIN_TYPES, TaskExecutor
+from .neuron import Neuron, NeuronType
+from .sinks import MemorySink, ResultSink, ResultSummary
+
+T = TypeVar("T")
+
+DISTRIBUTIONS: Dict[str, Callable[[random.Random, float], float]] = {
+    "constant": lambda rng, mean: mean,
+    "uniform": lambda rng, mean: rng.uniform(0.5 * mean, 1.5 * mean),
+    "exponential": lambda rng, mean: rng.expovariate(1.0 / mean),
+    # mu = -sigma**2 / 2 keeps the mean of the multiplier at 1
+    "lognormal": lambda rng, mean: mean * rng.lognormvariate(-0.125, 0.5),
+}
+
+# Mean latencies matching the real neurons' simulated processing times
+MEAN_LATENCY = {
+    NeuronType.PRIMARY: 1.5,
+    NeuronType.SECONDARY: 1.0,
+    NeuronType.CUSTOM: 2.0,
+}
+
+
+class _VirtualSelector:
+    """Selector wrapper that advances a virtual clock instead of blocking"""
+
+    def __init__(self, selector: selectors.BaseSelector):
+        self._selector = selector
+        self.now = 0.0
+
+    def select(self, timeout: Optional[float] = None):
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # Nothing scheduled: only real I/O can wake the loop
+            return self._selector.select(None)
+        self.now += timeout
+        return []
+
+    def __getattr__(self, name: str):
+        return getattr(self._selector, name)
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop running on virtual time"""
+
+    def __init__(self):
+        self._virtual = _VirtualSelector(selectors.DefaultSelector())
+        super().__init__(self._virtual)
+
+    def time(self) -> float:
+        return self._virtual.now
+
+
+def run_virtual(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on a fresh ``VirtualTimeLoop``
+
+    The loop is never installed as the current event loop, so whatever loop
+    the caller has set is left alone.
+    """
+    loop = VirtualTimeLoop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+def _check_latency(mean_latency: float) -> None:
+    if not mean_latency > 0:
+        raise ValueError(f"mean latency must be positive, got {mean_latency}")
+
+
+def _check_failure_rate(failure_rate: float) -> None:
+    if not 0.0 <= failure_rate <= 1.0:
+        raise ValueError(f"failure_rate must be between 0 and 1, got {failure_rate}")
+
+
+class SimulatedNeuron(Neuron):
+    """Neuron with sampled latency and random failures"""
+
+    def __init__(self, name: str, neuron_type: NeuronType, mean_latency: float,
+                 distribution: str = "constant", failure_rate: float = 0.0,
+                 rng: Optional[random.Random] = None):
+        super().__init__(name, neuron_type)
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown distribution '{distribution}', "
+                f"expected one of: {', '.join(DISTRIBUTIONS)}"
+            )
+        _check_latency(mean_latency)
+        _check_failure_rate(failure_rate)
+        self.mean_latency = mean_latency
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.rng = rng or random.Random()
+
+    async def process(self, task: str) -> Dict[str, Any]:
+        """Process task after a sampled delay"""
+        self.status = "processing"
+        latency = DISTRIBUTIONS[self.distribution](self.rng, self.mean_latency)
+        failed = self.rng.random() < self.failure_rate
+        await asyncio.sleep(latency)
+        self.uptime += latency
+        self.status = "active"
+        return {
+            "task": task,
+            "status": "failed" if failed else "completed",
+            "neuron": self.name,
+            "strategy": "simulated"
+        }
+
+
+class SimulatedExecutor(TaskExecutor):
+    """Task executor whose neurons are all simulated
+
+    ``latencies`` and ``failure_rates`` override the mean latency and failure
+    rate of individual neurons, keyed by the name ``get_neuron`` takes
+    ("primary", "secondary" or a custom neuron's name).
+    """
+
+    def __init__(self, distribution: str = "constant", failure_rate: float = 0.0,
+                 seed: int = 0, latencies: Optional[Dict[str, float]] = None,
+                 failure_rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.latencies = dict(latencies or {})
+        self.failure_rates = dict(failure_rates or {})
+        for latency in self.latencies.values():
+            _check_latency(latency)
+        for rate in self.failure_rates.values():
+            _check_failure_rate(rate)
+        self.primary = self._neuron("primary", "Primary", NeuronType.PRIMARY)
+        self.secondary = self._neuron("secondary", "Secondary", NeuronType.SECONDARY)
+
+    def add_custom_neuron(self, name: str) -> None:
+        """Add a simulated custom neuron"""
+        if name not in self.custom_neurons:
+            self.custom_neurons[name] = self._neuron(name, name, NeuronType.CUSTOM)
+
+    def _neuron(self, key: str, name: str, neuron_type: NeuronType) -> SimulatedNeuron:
+        # Each neuron gets its own stream so adding one doesn't shift the others
+        return SimulatedNeuron(
+            name,
+            neuron_type,
+            self.latencies.get(key, MEAN_LATENCY[neuron_type]),
+            self.distribution,
+            self.failure_rates.get(key, self.failure_rate),
+            random.Random(f"{self.seed}:{name}")
+        )
+
+
+class SimulationReport:
+    """Outcome of a simulated run"""
+
+    def __init__(self, summary: ResultSummary, retries: int, virtual_seconds: float,
+                 wall_seconds: float, snapshot: Dict[str, Any]):
+        self.summary = summary
+        self.retries = retries
+        self.virtual_seconds = virtual_seconds
+        self.wall_seconds = wall_seconds
+        self.snapshot = snapshot
+
+    @property
+    def throughput(self) -> float:
+        """Results per virtual second"""
+        return self.summary.total / self.virtual_seconds if self.virtual_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary.to_dict(),
+            "retries": self.retries,
+            "virtual_seconds": self.virtual_seconds,
+            "wall_seconds": self.wall_seconds,
+            "throughput": self.throughput
+        }
+
+
+def simulate(tasks: Iterable[str], chain_type: str = "primary_to_secondary",
+             concurrency: int = 1, retries: int = 0, distribution: str = "constant",
+             failure_rate: float = 0.0, seed: int = 0,
+             sink: Optional[ResultSink] = None,
+             latencies: Optional[Dict[str, float]] = None,
+             failure_rates: Optional[Dict[str, float]] = None) -> SimulationReport:
+    """Run a chained workload on simulated neurons in virtual time
+
+    Tasks go through ``TaskExecutor.stream_chain_tasks``, the same scheduler
+    the ``chain`` command uses, so its concurrency and retry behaviour is what
+    gets measured; only the neurons and the clock are simulated.
+    ``latencies`` and ``failure_rates`` set per-neuron values as described on
+    ``SimulatedExecutor``.
+    """
+    if chain_type not in CHAIN_TYPES:
+        raise ValueError(
+            f"Unknown chain type '{chain_type}', expected one of: {', '.join(CHAIN_TYPES)}"
+        )
+    _check_failure_rate(failure_rate)
+    executor = SimulatedExecutor(distribution, failure_rate, seed, latencies, failure_rates)
+    sink = sink or MemorySink()
+
+    async def _run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await executor.stream_chain_tasks(tasks, chain_type, sink, concurrency, retries)
+        return loop.time() - started, executor.get_snapshot()
+
+    wall_started = time.perf_counter()
+    virtual_seconds, snapshot = run_virtual(_run())
+    return SimulationReport(
+        sink.summary, executor.stats.retries, virtual_seconds,
+        time.perf_counter() - wall_started, snapshot
+    )
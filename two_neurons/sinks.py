@@ -0,0 +1,201 @@
+"""Result sinks for chain runs
+
+A sink receives result dicts one at a time as they are produced. File-backed
+sinks buffer ``batch_size`` results and write each batch in one go, so memory
+stays bounded however many tasks a run covers. Every sink keeps a streaming
+``ResultSummary`` of counts by status and neuron.
+"""
+
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ResultSummary:
+    """Running counts of results by status and neuron"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Counter = Counter()
+        self.by_neuron: Counter = Counter()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.total += 1
+        self.by_status[result.get("status", "error" if "error" in result else "unknown")] += 1
+        self.by_neuron[result.get("neuron", "unknown")] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "by_status": dict(self.by_status),
+            "by_neuron": dict(self.by_neuron)
+        }
+
+
+class ResultSink(ABC):
+    """Base class for result sinks"""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        self.batch_size = batch_size
+        self.summary = ResultSummary()
+        self._batch: List[Dict[str, Any]] = []
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """Record one result, writing out the batch once it is full"""
+        self.summary.add(result)
+        self._batch.append(result)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out any buffered results"""
+        if self._batch:
+            self._write_batch(self._batch)
+            self._batch = []
+
+    def close(self) -> None:
+        """Flush and release the sink"""
+        self.flush()
+
+    @abstractmethod
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Persist one full batch of results"""
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class MemorySink(ResultSink):
+    """Keep every result in a list (the default)"""
+
+    def __init__(self):
+        # Batches of one go straight into the list, so nothing is held back
+        super().__init__(batch_size=1)
+        self.results: List[Dict[str, Any]] = []
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        self.results.extend(batch)
+
+
+class NDJSONSink(ResultSink):
+    """Append results to a newline-delimited JSON file"""
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(batch_size)
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        self._file.write("".join(json.dumps(result) + "\n" for result in batch))
+        self._file.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+class SQLiteSink(ResultSink):
+    """Insert results into a SQLite table"""
+
+    def __init__(self, path: str, table: str = "results",
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(batch_size)
+        self.path = path
+        self.table = table
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" '
+            "(id INTEGER PRIMARY KEY, task TEXT, neuron TEXT, status TEXT, result TEXT)"
+        )
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                f'INSERT INTO "{self.table}" (task, neuron, status, result) VALUES (?, ?, ?, ?)',
+                [
+                    (r.get("task"), r.get("neuron"), r.get("status"), json.dumps(r))
+                    for r in batch
+                ]
+            )
+
+    def close(self) -> None:
+        super().close()
+        self._conn.close()
+
+
+class ColumnarSink(ResultSink):
+    """Spill results to a column-oriented file, one record batch per line
+
+    Each line holds one batch as ``{"length": n, "columns": {name: {"values":
+    [...], "valid": [...]}}}``, in the spirit of Arrow record batches but
+    without extra dependencies. ``valid`` is a per-row mask telling a key that
+    was absent apart from one whose value was ``None``. Use ``read_columnar``
+    to stream the rows back.
+    """
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(batch_size)
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        names: Dict[str, None] = {}
+        for result in batch:
+            names.update(dict.fromkeys(result))
+        columns = {
+            name: {
+                "values": [result.get(name) for result in batch],
+                "valid": [name in result for result in batch]
+            }
+            for name in names
+        }
+        self._file.write(json.dumps({"length": len(batch), "columns": columns}) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+def read_columnar(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream rows back out of a ``ColumnarSink`` file"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            batch = json.loads(line)
+            columns = batch["columns"]
+            for i in range(batch["length"]):
+                yield {
+                    name: column["values"][i] for name, column in columns.items()
+                    if column["valid"][i]
+                }
+
+
+SINKS = {
+    "memory": MemorySink,
+    "ndjson": NDJSONSink,
+    "sqlite": SQLiteSink,
+    "columnar": ColumnarSink,
+}
+
+
+def create_sink(kind: str, path: Optional[str] = None,
+                batch_size: int = DEFAULT_BATCH_SIZE) -> ResultSink:
+    """Create a sink by name; every kind except ``memory`` needs a path"""
+    if kind not in SINKS:
+        raise ValueError(f"Unknown sink '{kind}', expected one of: {', '.join(SINKS)}")
+    if kind == "memory":
+        if path:
+            raise ValueError("Sink 'memory' keeps results in memory and takes no output path")
+        return MemorySink()
+    if not path:
+        raise ValueError(f"Sink '{kind}' needs an output path")
+    return SINKS[kind](path, batch_size=batch_size)